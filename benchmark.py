@@ -0,0 +1,597 @@
+# Course: CS261 - Data Structures
+# Author: Kyle Marrero
+# Assignment: 6
+# Description: Reproducible benchmark suite for DirectedGraph and UndirectedGraph
+
+import argparse
+from abc import ABC, abstractmethod
+import gc
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import tracemalloc
+from time import perf_counter
+
+from d_graph import DirectedGraph
+from ud_graph import UndirectedGraph
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+
+# number of vertices for each named scale
+SCALES = {'small': 50, 'medium': 200, 'large': 500}
+
+# how many sources / paths each query benchmark uses
+QUERY_SOURCES = 10
+QUERY_PATHS = 100
+PATH_LENGTH = 20
+
+# peak / held bytes may grow by this factor before a run fails, tracemalloc
+# counts are deterministic so this only needs to absorb real code changes
+MEMORY_TOLERANCE = 1.5
+
+# every timed sample repeats its case until it covers at least this many
+# seconds, so fast methods are measured well above timer and scheduler noise
+MIN_SAMPLE = 0.005
+
+
+# ---------------------------- generators ---------------------------- #
+
+def erdos_renyi(n: int, seed: int, avg_degree=4) -> []:
+    """
+    Return G(n, p) edges (u, v) with u < v, p chosen for the given average degree
+    """
+    rng = random.Random(seed)
+    p = min(1.0, avg_degree / max(n - 1, 1))
+    edges = []
+
+    for u in range(n):
+        for v in range(u + 1, n):
+            if rng.random() < p:
+                edges.append((u, v))
+
+    return edges
+
+
+def barabasi_albert(n: int, seed: int, m=2) -> []:
+    """
+    Return preferential attachment edges (new, old), each new vertex links to m old ones
+    """
+    rng = random.Random(seed)
+    edges = []
+
+    # every endpoint is repeated once per incident edge, so sampling from
+    # this list picks vertices proportionally to their degree
+    targets = list(range(m))
+    repeated = []
+
+    for v in range(m, n):
+        for t in set(targets):
+            edges.append((v, t))
+            repeated.extend((v, t))
+
+        chosen = set()
+        while len(chosen) < m:
+            chosen.add(rng.choice(repeated))
+        targets = list(chosen)
+
+    return edges
+
+
+def grid(n: int, seed: int, keep=0.9) -> []:
+    """
+    Return road-like edges on a square grid of about n vertices, dropping some streets
+    """
+    rng = random.Random(seed)
+    side = max(int(n ** 0.5), 1)
+    edges = []
+
+    for r in range(side):
+        for c in range(side):
+            v = r * side + c
+            if c + 1 < side and rng.random() < keep:
+                edges.append((v, v + 1))
+            if r + 1 < side and rng.random() < keep:
+                edges.append((v, v + side))
+
+    return edges
+
+
+def dag(n: int, seed: int, out_degree=2, span=2) -> []:
+    """
+    Return edges (u, v) of a random layered DAG: vertices are shuffled into
+    about sqrt(n) layers and each one links to out_degree vertices in the
+    next span layers, so every edge follows the (random) layer order
+    """
+    # separate seed stream so the DAG never mirrors the other generators
+    rng = random.Random(f'dag-{seed}')
+    order = list(range(n))
+    rng.shuffle(order)
+
+    width = max(int(n ** 0.5), 1)
+    layers = [order[i:i + width] for i in range(0, n, width)]
+    edges = []
+
+    for i, layer in enumerate(layers):
+        later = [v for nxt in layers[i + 1:i + 1 + span] for v in nxt]
+        if not later:
+            break
+        for u in layer:
+            for v in rng.sample(later, min(out_degree, len(later))):
+                edges.append((u, v))
+
+    return edges
+
+
+GENERATORS = {
+    'erdos_renyi': erdos_renyi,
+    'barabasi_albert': barabasi_albert,
+    'grid': grid,
+    'dag': dag,
+}
+
+
+def directed_edges(name: str, pairs: [], seed: int) -> []:
+    """
+    Return weighted directed edges for the pairs of a generator
+    """
+    rng = random.Random(seed)
+    edges = []
+
+    for u, v in pairs:
+        w = rng.randint(1, 20)
+        if name == 'grid':
+            # roads run both ways
+            edges.append((u, v, w))
+            edges.append((v, u, w))
+        elif name == 'dag' or rng.random() < 0.5:
+            # dag pairs already point along the topological order
+            edges.append((u, v, w))
+        else:
+            edges.append((v, u, w))
+
+    return edges
+
+
+def undirected_edges(pairs: []) -> []:
+    """
+    Return string-named edges for the pairs of a generator
+    """
+    return [(str(u), str(v)) for u, v in pairs]
+
+
+# ----------------------------- workloads ----------------------------- #
+
+class Workload(ABC):
+    """
+    Prepared inputs for benchmarking one graph class on one generated graph
+    - build() returns a fresh, fully populated graph
+    - cases maps case name to (prepare, run); prepare returns the graph to
+      run on, run returns (ops, result)
+    - cases in FRESH get a newly prepared graph every run: mutating methods,
+      and cold cases that must not reuse state cached by an earlier run
+    """
+
+    FRESH = {'add_vertex', 'add_edge', 'remove_edge', 'remove_vertex', 'compact',
+             'validate_paths_cold'}
+
+    def __init__(self, edges: [], vertices: [], seed: int):
+        rng = random.Random(seed)
+        self.edges = edges
+        self.vertices = vertices
+        self.sources = [rng.choice(vertices) for _ in range(QUERY_SOURCES)] if vertices else []
+        self.paths = self.random_walks(rng)
+        self.cases = dict()
+
+    @abstractmethod
+    def build(self):
+        """
+        Return a fresh graph holding all of the workload's edges
+        """
+
+    @abstractmethod
+    def neighbors(self, g, v) -> []:
+        """
+        Return the vertices reachable from v in one hop
+        """
+
+    def random_walks(self, rng) -> []:
+        """
+        Return QUERY_PATHS walks along existing edges (all valid paths)
+        """
+        g = self.build()
+        walks = []
+
+        for _ in range(QUERY_PATHS if self.vertices else 0):
+            v = rng.choice(self.vertices)
+            walk = [v]
+            for _ in range(PATH_LENGTH - 1):
+                out = self.neighbors(g, v)
+                if not out:
+                    break
+                v = rng.choice(out)
+                walk.append(v)
+            walks.append(walk)
+
+        return walks
+
+    def repeat(self, method: str, times=QUERY_SOURCES):
+        def run(g):
+            return times, [getattr(g, method)() for _ in range(times)]
+        return run
+
+    def per_source(self, method: str, *args):
+        def run(g):
+            return len(self.sources), [getattr(g, method)(s, *args) for s in self.sources]
+        return run
+
+    def per_path(self, method: str):
+        def run(g):
+            return len(self.paths), [getattr(g, method)(p) for p in self.paths]
+        return run
+
+    def batch(self, method: str):
+        def run(g):
+            return len(self.paths), getattr(g, method)(self.paths, details=True)
+        return run
+
+    def churned(self):
+        """
+        Return a built graph with every other vertex removed
+        """
+        g = self.build()
+        for v in self.vertices[::2]:
+            g.remove_vertex(v)
+        return g
+
+
+class DirectedWorkload(Workload):
+
+    def __init__(self, edges: [], n: int, seed: int):
+        self.n = n
+        super().__init__(edges, list(range(n)), seed)
+
+        def empty():
+            return DirectedGraph()
+
+        def add_vertex(g):
+            for _ in range(self.n):
+                g.add_vertex()
+            return self.n, g.v_count
+
+        def add_edge(g):
+            for u, v, w in self.edges:
+                g.add_edge(u, v, w)
+            return len(self.edges), g.adj_matrix
+
+        def remove_edge(g):
+            for u, v, _ in self.edges:
+                g.remove_edge(u, v)
+            return len(self.edges), g.adj_matrix
+
+        def remove_vertex(g):
+            for v in self.vertices:
+                g.remove_vertex(v)
+            return len(self.vertices), g.get_vertices()
+
+        self.cases = {
+            'add_vertex': (empty, add_vertex),
+            'add_edge': (self.vertices_only, add_edge),
+            'remove_edge': (self.build, remove_edge),
+            'remove_vertex': (self.build, remove_vertex),
+            'compact': (self.churned, self.repeat('compact', 1)),
+            'get_vertices': (self.build, self.repeat('get_vertices')),
+            'has_vertex': (self.churned, self.per_source('has_vertex')),
+            'get_edges': (self.build, self.repeat('get_edges')),
+            'is_valid_path': (self.build, self.per_path('is_valid_path')),
+            'validate_paths': (self.build, self.batch('validate_paths')),
+            'dfs': (self.build, self.per_source('dfs')),
+            'bfs': (self.build, self.per_source('bfs')),
+            'has_cycle': (self.build, self.repeat('has_cycle', 1)),
+            'dijkstra': (self.build, self.per_source('dijkstra')),
+            'k_nearest': (self.build, self.per_source('k_nearest', QUERY_SOURCES)),
+            'kruskal': (self.build, self.repeat('kruskal', 1)),
+            'prim': (self.build, self.repeat('prim', 1)),
+        }
+
+    def vertices_only(self):
+        g = DirectedGraph()
+        for _ in range(self.n):
+            g.add_vertex()
+        return g
+
+    def build(self):
+        g = self.vertices_only()
+        for u, v, w in self.edges:
+            g.add_edge(u, v, w)
+        return g
+
+    def neighbors(self, g, v) -> []:
+        return [i for i, w in enumerate(g.adj_matrix[v]) if w != 0]
+
+
+class UndirectedWorkload(Workload):
+
+    def __init__(self, edges: [], seed: int):
+        names = set()
+        for u, v in edges:
+            names.add(u)
+            names.add(v)
+        super().__init__(edges, sorted(names), seed)
+
+        def empty():
+            return UndirectedGraph()
+
+        def add_vertex(g):
+            for v in self.vertices:
+                g.add_vertex(v)
+            return len(self.vertices), g.adj_list
+
+        def add_edge(g):
+            for u, v in self.edges:
+                g.add_edge(u, v)
+            return len(self.edges), g.adj_list
+
+        def remove_edge(g):
+            for u, v in self.edges:
+                g.remove_edge(u, v)
+            return len(self.edges), g.adj_list
+
+        def remove_vertex(g):
+            for v in self.vertices:
+                g.remove_vertex(v)
+            return len(self.vertices), g.adj_list
+
+        self.cases = {
+            'add_vertex': (empty, add_vertex),
+            'add_edge': (self.vertices_only, add_edge),
+            'remove_edge': (self.build, remove_edge),
+            'remove_vertex': (self.build, remove_vertex),
+            'compact': (self.churned, self.repeat('compact', 1)),
+            'get_vertices': (self.build, self.repeat('get_vertices')),
+            'get_edges': (self.build, self.repeat('get_edges')),
+            'is_valid_path': (self.build, self.per_path('is_valid_path')),
+            # warm reuses the edge index cached by the first call, cold
+            # pays for building it every round
+            'validate_paths': (self.build, self.batch('validate_paths')),
+            'validate_paths_cold': (self.build, self.batch('validate_paths')),
+            'dfs': (self.build, self.per_source('dfs')),
+            'bfs': (self.build, self.per_source('bfs')),
+            'count_connected_components': (self.build, self.repeat('count_connected_components', 1)),
+            'has_cycle': (self.build, self.repeat('has_cycle', 1)),
+        }
+
+    def vertices_only(self):
+        g = UndirectedGraph()
+        for v in self.vertices:
+            g.add_vertex(v)
+        return g
+
+    def build(self):
+        return UndirectedGraph(self.edges)
+
+    def neighbors(self, g, v) -> []:
+        return g.adj_list[v]
+
+
+def workloads(scales: [], seed: int):
+    """
+    Yield (graph class name, generator, scale, workload) for every combination
+    """
+    for scale in scales:
+        n = SCALES[scale]
+        for name, generate in GENERATORS.items():
+            pairs = generate(n, seed)
+            # grid rounds n down to a square
+            size = max(int(n ** 0.5), 1) ** 2 if name == 'grid' else n
+            yield 'DirectedGraph', name, scale, DirectedWorkload(directed_edges(name, pairs, seed), size, seed)
+            yield 'UndirectedGraph', name, scale, UndirectedWorkload(undirected_edges(pairs), seed)
+
+
+# ------------------------------ runner ------------------------------ #
+
+def digest(result) -> str:
+    """
+    Return a short, stable fingerprint of a benchmark result
+    """
+    return hashlib.sha1(repr(result).encode()).hexdigest()[:12]
+
+
+def measure(prepare, run, repeat: int, fresh: bool) -> dict:
+    """
+    Time run and keep the fastest round, then do one extra traced run for
+    peak memory. Each of the repeat samples runs the case enough rounds to
+    cover MIN_SAMPLE seconds; with fresh=True every round gets a newly
+    prepared graph, built outside the timed region. The minimum over all
+    rounds is the least disturbed by other load on the machine; like timeit,
+    garbage collection is paused while timing
+    """
+    g = prepare()
+    start = perf_counter()
+    ops, result = run(g)
+    best = perf_counter() - start
+    rounds = math.ceil(MIN_SAMPLE / best) if 0 < best < MIN_SAMPLE else 1
+
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for _ in range(rounds):
+                if fresh:
+                    g = prepare()
+                start = perf_counter()
+                run(g)
+                best = min(best, perf_counter() - start)
+    finally:
+        gc.enable()
+
+    g = prepare()
+    tracemalloc.start()
+    run(g)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'ops': ops,
+        'rounds': rounds,
+        'seconds': best,
+        'ops_per_sec': ops / best if best > 0 else float('inf'),
+        'peak_bytes': peak,
+        'digest': digest(result),
+    }
+
+
+def graph_bytes(build) -> int:
+    """
+    Return bytes allocated while building a graph and still held afterwards
+    """
+    tracemalloc.start()
+    g = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del g
+    return size
+
+
+def run_suite(scales: [], seed: int, repeat: int, methods=None) -> dict:
+    """
+    Return {key: measurement}, key is 'Class/generator/scale/method'
+    """
+    results = dict()
+
+    for cls, name, scale, work in workloads(scales, seed):
+        prefix = f'{cls}/{name}/{scale}'
+        results[f'{prefix}/build'] = {'graph_bytes': graph_bytes(work.build)}
+        for method, (prepare, run) in work.cases.items():
+            if methods and method not in methods:
+                continue
+            results[f'{prefix}/{method}'] = measure(prepare, run, repeat, method in work.FRESH)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, memory_tolerance=MEMORY_TOLERANCE) -> []:
+    """
+    Return a list of regression messages, empty if results match the baseline.
+    A benchmark without a baseline entry is reported too, it cannot be checked
+    """
+    problems = []
+
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if base is None:
+            problems.append(f'{key}: no baseline entry, run with --update-baseline')
+            continue
+        for field in ('peak_bytes', 'graph_bytes'):
+            if field in cur and cur[field] > base[field] * memory_tolerance:
+                ratio = cur[field] / base[field] if base[field] else float('inf')
+                problems.append(f'{key}: {field} {ratio:.2f}x the baseline '
+                                f'({base[field]} -> {cur[field]})')
+        if 'seconds' not in cur:
+            continue
+        if cur['digest'] != base['digest']:
+            problems.append(f'{key}: result changed ({base["digest"]} -> {cur["digest"]})')
+        if cur['seconds'] > base['seconds'] * tolerance:
+            ratio = cur['seconds'] / base['seconds']
+            problems.append(f'{key}: {ratio:.2f}x slower than baseline')
+
+    return problems
+
+
+def confirm(results: dict, baseline: dict, tolerance: float, seed: int, repeat: int) -> None:
+    """
+    Re-measure benchmarks that look slower than tolerance allows and keep the
+    faster timing, so one burst of load on the machine does not fail the run
+    """
+    slow = [key for key, cur in results.items()
+            if 'seconds' in cur and key in baseline
+            and cur['seconds'] > baseline[key]['seconds'] * tolerance]
+    if not slow:
+        return
+
+    # keys are 'Class/generator/scale/method'
+    scales = sorted({key.split('/')[2] for key in slow})
+    methods = {key.split('/')[3] for key in slow}
+    again = run_suite(scales, seed, repeat, methods)
+
+    for key in slow:
+        if again[key]['seconds'] < results[key]['seconds']:
+            results[key] = again[key]
+
+
+def report(results: dict) -> str:
+    """
+    Return results as a human-readable table
+    """
+    out = ['{:<58} {:>8} {:>12} {:>14} {:>12}'.format(
+        'benchmark', 'ops', 'seconds', 'ops/sec', 'peak bytes')]
+
+    for key, r in results.items():
+        if 'seconds' in r:
+            out.append('{:<58} {:>8} {:>12.6f} {:>14.1f} {:>12}'.format(
+                key, r['ops'], r['seconds'], r['ops_per_sec'], r['peak_bytes']))
+        else:
+            out.append('{:<58} {:>8} {:>12} {:>14} {:>12}'.format(
+                key, '-', '-', '-', r['graph_bytes']))
+
+    return '\n'.join(out)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark DirectedGraph and UndirectedGraph')
+    parser.add_argument('--scales', nargs='+', default=['small', 'medium'], choices=sorted(SCALES))
+    parser.add_argument('--methods', nargs='+', help='only benchmark these methods')
+    parser.add_argument('--seed', type=int, default=261)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=3.0,
+                        help='fail when a benchmark is this many times slower than the baseline')
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE,
+                        help='fail when peak or held bytes grow by more than this factor')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='add benchmarks missing from the baseline, existing entries are kept')
+    parser.add_argument('--reset-baseline', action='store_true',
+                        help='overwrite every baseline entry measured by this run')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.scales, args.seed, args.repeat, args.methods)
+    print(report(results))
+
+    if args.update_baseline or args.reset_baseline:
+        baseline = dict()
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        added = 0
+        for key, r in results.items():
+            if args.reset_baseline or key not in baseline:
+                baseline[key] = r
+                added += 1
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f'\n{added} baseline entries written to {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'\nno baseline at {args.baseline}, run with --update-baseline')
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    confirm(results, baseline, args.tolerance, args.seed, args.repeat)
+    problems = compare(results, baseline, args.tolerance, args.memory_tolerance)
+    if problems:
+        print('\nREGRESSIONS:')
+        for p in problems:
+            print('  ' + p)
+        return 1
+
+    print('\nno regressions against baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,7 +4,9 @@
 # Description: DirectedGraph Implementation
 
 from collections import deque
+import copy
 import heapq
+from graph_profiler import GraphProfiler, instrument, plain_state, profiled, restore_state, uninstrument
 
 class DirectedGraph:
     """
@@ -13,8 +15,15 @@ class DirectedGraph:
     - loops not allowed
     - only positive edge weights
     - vertex names are integers
+    - removed vertices keep their id (tombstone) until compact()
     """
 
+    # opt-in instrumentation, see enable_profiling()
+    profiler = None
+
+    # ids of removed vertices, created on first remove_vertex()
+    removed = None
+
     def __init__(self, start_edges=None):
         """
         Store graph info as adjacency matrix
@@ -53,6 +62,34 @@ class DirectedGraph:
 
     # ------------------------------------------------------------------ #
 
+    def enable_profiling(self, profiler=None) -> GraphProfiler:
+        """
+        attach a profiler (a new one if none given) and return it
+        """
+        self.profiler = profiler if profiler is not None else GraphProfiler()
+        instrument(self, self.profiler)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        """
+        detach the profiler, methods go back to running uninstrumented
+        """
+        uninstrument(self)
+        self.profiler = None
+
+    def __getstate__(self) -> dict:
+        """
+        return attributes for copy/pickle, leaving out the timing wrappers
+        """
+        return plain_state(self)
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        restore attributes from copy/pickle, re-binding timing wrappers if profiled
+        """
+        restore_state(self, state)
+
+    @profiled
     def add_vertex(self) -> int:
         """
         add a new vertex to the graph
@@ -68,8 +105,13 @@ class DirectedGraph:
 
         self.adj_matrix.append(l)
 
+        # one new column in every old row, plus the new row
+        if self.profiler is not None:
+            self.profiler.incr('add_vertex', 'matrix_cells_grown', 2 * self.v_count - 1)
+
         return self.v_count
 
+    @profiled
     def add_edge(self, src: int, dst: int, weight=1) -> None:
         """
         add an edge and weight to the graph (weight defaults to 1)
@@ -78,8 +120,13 @@ class DirectedGraph:
         if src >= self.v_count or dst >= self.v_count or src < 0 or dst < 0 or weight < 0 or src == dst:
             return
 
+        # no edges to or from removed vertices
+        if self.removed and (src in self.removed or dst in self.removed):
+            return
+
         self.adj_matrix[src][dst] = weight
 
+    @profiled
     def remove_edge(self, src: int, dst: int) -> None:
         """
         remove an edge from the graph
@@ -89,6 +136,43 @@ class DirectedGraph:
 
         self.adj_matrix[src][dst] = 0        
 
+    @profiled
+    def remove_vertex(self, v: int) -> None:
+        """
+        remove a vertex and all its edges, the id stays reserved until compact()
+        """
+        if not self.has_vertex(v):
+            return
+
+        if self.removed is None:
+            self.removed = set()
+        self.removed.add(v)
+
+        # clear outgoing row and incoming column in place, no matrix rebuild
+        row = self.adj_matrix[v]
+        for i in range(self.v_count):
+            row[i] = 0
+            self.adj_matrix[i][v] = 0
+
+    @profiled
+    def compact(self) -> dict:
+        """
+        drop removed vertices from the matrix, renumbering the remaining ones
+        in order, and return a dict mapping old id to new id
+        """
+        survivors = [v for v in range(self.v_count) if not self.removed or v not in self.removed]
+        mapping = {old: new for new, old in enumerate(survivors)}
+
+        # only rebuild the matrix when there is something to drop
+        if len(survivors) != self.v_count:
+            self.adj_matrix = [[self.adj_matrix[i][j] for j in survivors] for i in survivors]
+            self.v_count = len(survivors)
+
+        self.removed = None
+
+        return mapping
+
+    @profiled
     def get_vertices(self) -> []:
         """
         return the vertices in the graph
@@ -96,10 +180,21 @@ class DirectedGraph:
         vertices = []
 
         for v in range(self.v_count):
-            vertices.append(v)
+            if not self.removed or v not in self.removed:
+                vertices.append(v)
 
         return vertices
 
+    def has_vertex(self, v: int) -> bool:
+        """
+        return True if v is a vertex of the graph (in range and not removed)
+        """
+        if v < 0 or v >= self.v_count:
+            return False
+
+        return not self.removed or v not in self.removed
+
+    @profiled
     def get_edges(self) -> []:
         """
         return the edges in the graph
@@ -115,6 +210,7 @@ class DirectedGraph:
 
         return edges
 
+    @profiled
     def is_valid_path(self, path: []) -> bool:
         """
         Return true if provided path is valid, False otherwise
@@ -125,8 +221,15 @@ class DirectedGraph:
 
         start = path[0]
 
+        if not self.has_vertex(start):
+            return False
+
         for i in range(1, len(path)):
 
+            # out of range vertex, thus invalid
+            if path[i] < 0 or path[i] >= self.v_count:
+                return False
+
             # if any index has value 0, there is no path, thus invalid
             if self.adj_matrix[start][path[i]] == 0:
                 return False
@@ -135,6 +238,52 @@ class DirectedGraph:
 
         return True
 
+    @profiled
+    def validate_paths(self, paths: [], details=False):
+        """
+        Check many paths in one call, return a list of booleans (one per path).
+        With details=True return (valid, first_invalid, weights) lists instead:
+        first_invalid is the index of the first vertex that cannot be reached
+        (None if valid), weights is the total path weight (None if invalid)
+        """
+        matrix = self.adj_matrix
+        n = self.v_count
+        removed = self.removed
+        valid = []
+        first_invalid = []
+        weights = []
+
+        for path in paths:
+            bad = None
+            total = 0
+
+            if path:
+                start = path[0]
+                if start < 0 or start >= n or (removed and start in removed):
+                    bad = 0
+                else:
+                    # removed vertices have no edges, so only hop targets need a
+                    # bounds check and each hop is a single lookup in the cached row
+                    row = matrix[start]
+                    for i in range(1, len(path)):
+                        v = path[i]
+                        if v < 0 or v >= n or row[v] == 0:
+                            bad = i
+                            break
+                        total += row[v]
+                        row = matrix[v]
+
+            valid.append(bad is None)
+            if details:
+                first_invalid.append(bad)
+                weights.append(total if bad is None else None)
+
+        if details:
+            return valid, first_invalid, weights
+
+        return valid
+
+    @profiled
     def dfs(self, v_start, v_end=None) -> []:
         """
         Return list of vertices visited during DFS search
@@ -144,15 +293,19 @@ class DirectedGraph:
         d = deque()
         visited = []
 
-        if v_start < 0 or v_start >= self.v_count:
+        if not self.has_vertex(v_start):
             return visited
 
-        if v_end is not None and (v_end < 0 or v_end >= self.v_count):
+        if v_end is not None and not self.has_vertex(v_end):
             v_end = None
 
         d.append(v_start)
+        prof = self.profiler
+        peak = 1
 
         while d:
+            if prof is not None and len(d) > peak:
+                peak = len(d)
             # pop next vertex to explore off stack
             vert = d.pop()
             if vert not in visited:
@@ -169,8 +322,13 @@ class DirectedGraph:
                     if self.adj_matrix[vert][i] != 0 and i not in v:
                         d.append(i)
 
+        if prof is not None:
+            prof.incr('dfs', 'vertices_expanded', len(v))
+            prof.peak('dfs', 'peak_frontier', peak)
+
         return visited
 
+    @profiled
     def bfs(self, v_start, v_end=None) -> []:
         """
         Return list of vertices visited during BFS search
@@ -180,15 +338,19 @@ class DirectedGraph:
         d = deque()
         visited = []
 
-        if v_start < 0 or v_start >= self.v_count:
+        if not self.has_vertex(v_start):
             return visited
 
-        if v_end is not None and (v_end < 0 or v_end >= self.v_count):
+        if v_end is not None and not self.has_vertex(v_end):
             v_end = None
 
         d.appendleft(v_start)
+        prof = self.profiler
+        peak = 1
 
         while d:
+            if prof is not None and len(d) > peak:
+                peak = len(d)
             vert = d.pop()
             if vert not in visited:
                 visited.append(vert)
@@ -204,8 +366,13 @@ class DirectedGraph:
                     if self.adj_matrix[vert][i] != 0 and i not in v:
                         d.appendleft(i)
 
+        if prof is not None:
+            prof.incr('bfs', 'vertices_expanded', len(v))
+            prof.peak('bfs', 'peak_frontier', peak)
+
         return visited
 
+    @profiled
     def has_cycle(self):
         """
         Return True if graph contains a cycle, False otherwise (uses DFS)
@@ -243,6 +410,7 @@ class DirectedGraph:
 
         return False
 
+    @profiled
     def dijkstra(self, src: int) -> []:
         """
         implements dijkstra's algorithm, uses a priority queue to determine the
@@ -256,9 +424,21 @@ class DirectedGraph:
         for i in range(self.v_count):
             paths.append(float('inf'))
 
+        # removed source reaches nothing
+        if not self.has_vertex(src):
+            return paths
+
+        prof = self.profiler
+        pushes = 0
+        pops = 0
+        peak = 1
+
         while pq:
+            if prof is not None and len(pq) > peak:
+                peak = len(pq)
             # assign vertex and distance, and remove min heap value
             d, v = heapq.heappop(pq)
+            pops += 1
 
             if v not in visited:
                 # add to visited dictionary
@@ -271,13 +451,175 @@ class DirectedGraph:
                         dist = d + self.adj_matrix[v][i]
                         # push tuple of distance and vertex into prioity queue and maintain minheap
                         heapq.heappush(pq, (dist, i))
+                        pushes += 1
 
         # for all explored vertices, add their distance to list
         for k, v in visited.items():
             paths[k] = v
 
+        # every push comes from relaxing an edge, the source is seeded directly
+        if prof is not None:
+            prof.incr('dijkstra', 'vertices_expanded', len(visited))
+            prof.incr('dijkstra', 'edges_relaxed', pushes)
+            prof.incr('dijkstra', 'heap_pushes', pushes)
+            prof.incr('dijkstra', 'heap_pops', pops)
+            prof.peak('dijkstra', 'peak_frontier', peak)
+
         return paths
 
+    @profiled
+    def k_nearest(self, src: int, k: int) -> []:
+        """
+        dijkstra's algorithm that stops once k vertices other than src are
+        settled, returns their (vertex, distance) pairs closest first
+        """
+        nearest = []
+
+        if not self.has_vertex(src) or k <= 0:
+            return nearest
+
+        settled = set()
+        dist = {src: 0}
+        pq = [(0, src)]
+        prof = self.profiler
+        pushes = 0
+        pops = 0
+
+        while pq:
+            d, v = heapq.heappop(pq)
+            pops += 1
+
+            if v in settled:
+                continue
+            settled.add(v)
+
+            if v != src:
+                nearest.append((v, d))
+                # k settled, the k-th vertex's edges are never needed
+                if len(nearest) == k:
+                    break
+
+            row = self.adj_matrix[v]
+            for i in range(self.v_count):
+                # only push when the distance improves, keeps the heap small
+                if row[i] != 0 and i not in settled:
+                    dist_i = d + row[i]
+                    if dist_i < dist.get(i, float('inf')):
+                        dist[i] = dist_i
+                        heapq.heappush(pq, (dist_i, i))
+                        pushes += 1
+
+        if prof is not None:
+            prof.incr('k_nearest', 'vertices_expanded', len(settled))
+            prof.incr('k_nearest', 'edges_relaxed', pushes)
+            prof.incr('k_nearest', 'heap_pushes', pushes)
+            prof.incr('k_nearest', 'heap_pops', pops)
+
+        return nearest
+
+    @profiled
+    def kruskal(self) -> []:
+        """
+        minimum spanning forest of the graph with edge directions ignored
+        (the lighter weight is used when both directions exist), using
+        Kruskal's algorithm: sort the edges, join components with union-find.
+        Returns (u, v, weight) edges with u < v
+        """
+        edges = []
+
+        for i in range(self.v_count):
+            row = self.adj_matrix[i]
+            for j in range(i + 1, self.v_count):
+                a, b = row[j], self.adj_matrix[j][i]
+                w = a if b == 0 or (a != 0 and a < b) else b
+                if w != 0:
+                    edges.append((w, i, j))
+
+        edges.sort()
+
+        parent = list(range(self.v_count))
+        size = [1] * self.v_count
+
+        def find(x):
+            # path halving, every other vertex on the way points to its grandparent
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        forest = []
+        # count vertices directly, get_vertices() would show up in profiles
+        limit = sum(1 for v in range(self.v_count) if self.has_vertex(v)) - 1
+
+        for w, u, v in edges:
+            ru, rv = find(u), find(v)
+            if ru == rv:
+                continue
+
+            # union by size keeps the trees shallow
+            if size[ru] < size[rv]:
+                ru, rv = rv, ru
+            parent[rv] = ru
+            size[ru] += size[rv]
+            forest.append((u, v, w))
+
+            # a spanning tree is complete, the rest would all form cycles
+            if len(forest) == limit:
+                break
+
+        if self.profiler is not None:
+            self.profiler.incr('kruskal', 'edges_sorted', len(edges))
+
+        return forest
+
+    @profiled
+    def prim(self) -> []:
+        """
+        minimum spanning forest of the graph with edge directions ignored
+        (the lighter weight is used when both directions exist), using
+        Prim's algorithm with a priority queue, one tree per component.
+        Returns (u, v, weight) edges with u < v
+        """
+        visited = set()
+        forest = []
+        prof = self.profiler
+        pushes = 0
+        pops = 0
+
+        for start in range(self.v_count):
+            if start in visited or not self.has_vertex(start):
+                continue
+
+            pq = [(0, start, start)]
+
+            while pq:
+                w, u, v = heapq.heappop(pq)
+                pops += 1
+
+                if v in visited:
+                    continue
+                visited.add(v)
+
+                if v != u:
+                    forest.append((min(u, v), max(u, v), w))
+
+                for i in range(self.v_count):
+                    if i in visited:
+                        continue
+                    a, b = self.adj_matrix[v][i], self.adj_matrix[i][v]
+                    weight = a if b == 0 or (a != 0 and a < b) else b
+                    if weight != 0:
+                        heapq.heappush(pq, (weight, v, i))
+                        pushes += 1
+
+        # each component's start is seeded directly, not pushed
+        if prof is not None:
+            prof.incr('prim', 'vertices_expanded', len(visited))
+            prof.incr('prim', 'heap_pushes', pushes)
+            prof.incr('prim', 'heap_pops', pops)
+
+        return forest
+
 
 
 if __name__ == '__main__':
@@ -365,3 +707,69 @@ if __name__ == '__main__':
     print(g.dijkstra(0))
 
 
+    print("\nmethod validate_paths() example 1")
+    print("---------------------------------")
+    edges = [(0, 1, 10), (4, 0, 12), (1, 4, 15), (4, 3, 3),
+             (3, 1, 5), (2, 1, 23), (3, 2, 7)]
+    g = DirectedGraph(edges)
+    test_cases = [[0, 1, 4, 3], [1, 3, 2, 1], [0, 4], [4, 0], [], [2], [7], [3, -1]]
+    print(g.validate_paths(test_cases))
+    valid, first_invalid, weights = g.validate_paths(test_cases, details=True)
+    for path, ok, bad, weight in zip(test_cases, valid, first_invalid, weights):
+        print(path, ok, bad, weight, g.is_valid_path(path))
+
+
+    print("\nmethod kruskal() / prim() / k_nearest() example 1")
+    print("-------------------------------------------------")
+    edges = [(0, 1, 10), (4, 0, 12), (1, 4, 15), (4, 3, 3),
+             (3, 1, 5), (2, 1, 23), (3, 2, 7), (5, 6, 2), (6, 5, 1)]
+    g = DirectedGraph(edges)
+    # directions ignored, the lighter of 5 -> 6 and 6 -> 5 is used
+    print(f'KRUSKAL {g.kruskal()}')
+    print(f'PRIM    {g.prim()}')
+    for i in range(7):
+        print(f'K_NEAREST {i} {g.k_nearest(i, 2)} DIJKSTRA {g.dijkstra(i)}')
+    g.remove_vertex(3)
+    print(f'KRUSKAL {g.kruskal()}')
+    print(f'PRIM    {g.prim()}')
+    print(f'K_NEAREST 4 {g.k_nearest(4, 10)} K_NEAREST 3 {g.k_nearest(3, 2)}')
+
+
+    print("\nmethod remove_vertex() / compact() example 1")
+    print("--------------------------------------------")
+    edges = [(0, 1, 10), (4, 0, 12), (1, 4, 15), (4, 3, 3),
+             (3, 1, 5), (2, 1, 23), (3, 2, 7)]
+    g = DirectedGraph(edges)
+    g.remove_vertex(1)
+    g.remove_vertex(9)
+    print(g.get_vertices(), g.get_edges(), sep='\n')
+    # edges to or from a removed vertex are ignored
+    g.add_edge(1, 2, 4)
+    g.add_edge(2, 1, 4)
+    print(g.get_edges())
+    # removed ids reach nothing and cannot be reached
+    print(f'DFS 1:{g.dfs(1)} BFS 4:{g.bfs(4)} BFS 4-1:{g.bfs(4, 1)}')
+    for i in range(5):
+        print(f'DIJKSTRA {i} {g.dijkstra(i)}')
+    print(g.compact())
+    print(g.get_vertices(), g.get_edges(), sep='\n')
+    print(g)
+    for i in range(g.v_count):
+        print(f'DIJKSTRA {i} {g.dijkstra(i)}')
+
+
+    print("\nmethod enable_profiling() example 1")
+    print("----------------------------------")
+    edges = [(0, 1, 10), (4, 0, 12), (1, 4, 15), (4, 3, 3),
+             (3, 1, 5), (2, 1, 23), (3, 2, 7)]
+    g = DirectedGraph(edges)
+    prof = g.enable_profiling()
+    g.dijkstra(0)
+    # a profiled copy mutates only itself and reports to its own profiler
+    h = copy.deepcopy(g)
+    h.add_edge(1, 0, 5)
+    h.remove_vertex(4)
+    print(g.get_edges(), h.get_edges(), sep='\n')
+    print(sorted(prof.calls.items()))
+    print(sorted(h.profiler.calls.items()))
+    print(prof.to_prometheus(), end='')
@@ -0,0 +1,169 @@
+# Course: CS261 - Data Structures
+# Author: Kyle Marrero
+# Assignment: 6
+# Description: Opt-in profiling hooks shared by DirectedGraph and UndirectedGraph
+
+from functools import wraps
+from time import perf_counter
+from types import MethodType
+
+
+class GraphProfiler:
+    """
+    Class to collect per-method call counts, wall time and hot-path counters
+    - counters are summed across calls (vertices_expanded, heap_pushes, ...)
+    - peaks keep the largest value seen (peak_frontier, ...)
+    - every counter is keyed by the method that reported it
+    - attach with enable_profiling() on a graph, which binds timing wrappers
+      on that instance only
+    """
+
+    def __init__(self):
+        """
+        Start with empty statistics
+        """
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clear all recorded statistics
+        """
+        self.calls = dict()
+        self.wall_time = dict()
+        self.counters = dict()
+        self.peaks = dict()
+
+    def record_call(self, method: str, elapsed: float) -> None:
+        """
+        Record one call to method that took elapsed seconds
+        """
+        self.calls[method] = self.calls.get(method, 0) + 1
+        self.wall_time[method] = self.wall_time.get(method, 0.0) + elapsed
+
+    def incr(self, method: str, name: str, amount=1) -> None:
+        """
+        Add amount to the counter name of method
+        """
+        key = (method, name)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def peak(self, method: str, name: str, value) -> None:
+        """
+        Keep the largest value seen for the gauge name of method
+        """
+        key = (method, name)
+        if value > self.peaks.get(key, 0):
+            self.peaks[key] = value
+
+    def as_dict(self) -> dict:
+        """
+        Return statistics as a nested dict keyed by method name
+        """
+        out = dict()
+
+        for method in self.calls:
+            out[method] = {'calls': self.calls[method],
+                           'wall_time': self.wall_time[method]}
+
+        # counters and peaks can be reported by helpers that are not timed
+        for (method, name), value in self.counters.items():
+            out.setdefault(method, {})[name] = value
+        for (method, name), value in self.peaks.items():
+            out.setdefault(method, {})[name] = value
+
+        return out
+
+    def to_prometheus(self, prefix='graph') -> str:
+        """
+        Return statistics in the Prometheus text exposition format
+        """
+        lines = []
+
+        def family(name, kind, samples):
+            if not samples:
+                return
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            for method, value in sorted(samples):
+                lines.append(f'{prefix}_{name}{{method="{method}"}} {value}')
+
+        family('calls_total', 'counter', self.calls.items())
+        family('wall_time_seconds_total', 'counter', self.wall_time.items())
+
+        # one metric family per counter / gauge name
+        for kind, source, suffix in (('counter', self.counters, '_total'),
+                                     ('gauge', self.peaks, '')):
+            names = sorted({name for _, name in source})
+            for name in names:
+                samples = [(m, v) for (m, n), v in source.items() if n == name]
+                family(name + suffix, kind, samples)
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def profiled(method):
+    """
+    Mark method to be timed once a profiler is attached with instrument().
+    The method itself is returned unchanged, so it costs nothing while
+    profiling is off
+    """
+    method.profiled = True
+    return method
+
+
+def profiled_names(cls) -> []:
+    """
+    Return the names of the @profiled methods of a graph class
+    """
+    return [name for name in dir(cls) if getattr(getattr(cls, name), 'profiled', False)]
+
+
+def instrument(graph, profiler: GraphProfiler) -> None:
+    """
+    Bind a timing wrapper for every @profiled method onto the graph instance,
+    the instance attribute shadows the plain method on the class.
+    Wrappers wrap the class function and are bound with MethodType, so they
+    always act on (and report to the profiler of) the graph they are bound to
+    """
+    cls = type(graph)
+
+    def timed(func, name):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self.profiler.record_call(name, perf_counter() - start)
+        return wrapper
+
+    graph.profiler = profiler
+
+    for name in profiled_names(cls):
+        setattr(graph, name, MethodType(timed(getattr(cls, name), name), graph))
+
+
+def uninstrument(graph) -> None:
+    """
+    Remove the timing wrappers bound by instrument()
+    """
+    for name in profiled_names(type(graph)):
+        graph.__dict__.pop(name, None)
+
+
+def plain_state(graph) -> dict:
+    """
+    Return the graph's attributes without the timing wrappers, for
+    __getstate__ (copy and pickle); the profiler itself is kept
+    """
+    names = profiled_names(type(graph))
+    return {k: v for k, v in graph.__dict__.items() if k not in names}
+
+
+def restore_state(graph, state: dict) -> None:
+    """
+    Restore attributes saved by plain_state() and re-bind the timing
+    wrappers if the graph was being profiled, for __setstate__
+    """
+    graph.__dict__.update(state)
+    if graph.profiler is not None:
+        instrument(graph, graph.profiler)
@@ -4,6 +4,7 @@
 # Description: UndirectedGraph implementation
 
 from collections import deque
+from graph_profiler import GraphProfiler, instrument, plain_state, profiled, restore_state, uninstrument
 
 class UndirectedGraph:
     """
@@ -14,6 +15,13 @@ class UndirectedGraph:
     - vertex names are strings
     """
 
+    # opt-in instrumentation, see enable_profiling()
+    profiler = None
+
+    # neighbor sets built by the first validate_paths() call, then kept in
+    # step with add/remove methods (direct edits of adj_list bypass it)
+    edge_index = None
+
     def __init__(self, start_edges=None):
         """
         Store graph info as adjacency list
@@ -41,6 +49,34 @@ class UndirectedGraph:
 
     # ------------------------------------------------------------------ #
 
+    def enable_profiling(self, profiler=None) -> GraphProfiler:
+        """
+        Attach a profiler (a new one if none given) and return it
+        """
+        self.profiler = profiler if profiler is not None else GraphProfiler()
+        instrument(self, self.profiler)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        """
+        Detach the profiler, methods go back to running uninstrumented
+        """
+        uninstrument(self)
+        self.profiler = None
+
+    def __getstate__(self) -> dict:
+        """
+        Return attributes for copy/pickle, leaving out the timing wrappers
+        """
+        return plain_state(self)
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore attributes from copy/pickle, re-binding timing wrappers if profiled
+        """
+        restore_state(self, state)
+
+    @profiled
     def add_vertex(self, v: str) -> None:
         """
         Add new vertex to the graph
@@ -50,7 +86,11 @@ class UndirectedGraph:
         if v not in self.adj_list:
             self.adj_list[v] = []
 
+        if self.edge_index is not None:
+            self.edge_index.setdefault(v, set())
+
         
+    @profiled
     def add_edge(self, u: str, v: str) -> None:
         """
         Add edge to the graph
@@ -71,8 +111,13 @@ class UndirectedGraph:
         elif u not in self.adj_list[v]:
             self.adj_list[v].append(u)
 
+        if self.edge_index is not None:
+            self.edge_index.setdefault(u, set()).add(v)
+            self.edge_index.setdefault(v, set()).add(u)
+
         # print(self.adj_list)
 
+    @profiled
     def remove_edge(self, v: str, u: str) -> None:
         """
         Remove edge from the graph
@@ -86,22 +131,49 @@ class UndirectedGraph:
 
         if u in self.adj_list[v]: 
             self.adj_list[v].remove(u)
+
+        if self.edge_index is not None:
+            self.edge_index[u].discard(v)
+            self.edge_index[v].discard(u)
         
 
+    @profiled
     def remove_vertex(self, v: str) -> None:
         """
-        Remove vertex and all connected edges
+        Remove vertex and all connected edges, visiting only the neighbors of v.
+        Each neighbor list is scanned to drop v, so the cost is the sum of the
+        neighbors' degrees rather than the degree of v
         """
-        # remove key if exists
-        if v in self.adj_list:
-            del self.adj_list[v]
+        if v not in self.adj_list:
+            return
 
-        # remove all other entries of v
-        for k in self.adj_list:
-            if v in self.adj_list[k]:
-                self.adj_list[k].remove(v)
-        
+        # only the neighbors of v can have an entry for it
+        for u in self.adj_list.pop(v):
+            self.adj_list[u].remove(v)
+
+        if self.edge_index is not None:
+            for u in self.edge_index.pop(v):
+                self.edge_index[u].discard(v)
 
+    @profiled
+    def compact(self) -> dict:
+        """
+        Rebuild the adjacency list to release memory held after removals,
+        return a dict mapping old vertex name to new vertex name
+        """
+        # dicts never shrink on deletion and lists keep spare capacity,
+        # copying both trims them to the surviving vertices and edges
+        self.adj_list = {v: list(self.adj_list[v]) for v in self.adj_list}
+
+        # the cached index has the same slack, the next validate_paths()
+        # builds a fresh one at the current size
+        self.edge_index = None
+
+        # vertices are named, so names do not change
+        return {v: v for v in self.adj_list}
+
+
+    @profiled
     def get_vertices(self) -> []:
         """
         Return list of vertices in the graph (any order)
@@ -115,6 +187,7 @@ class UndirectedGraph:
         return l
        
 
+    @profiled
     def get_edges(self) -> []:
         """
         Return list of edges in the graph (any order)
@@ -132,6 +205,7 @@ class UndirectedGraph:
         return l
         
 
+    @profiled
     def is_valid_path(self, path: []) -> bool:
         """
         Return true if provided path is valid, False otherwise
@@ -155,8 +229,46 @@ class UndirectedGraph:
 
         return True
 
-       
+    @profiled
+    def validate_paths(self, paths: [], details=False):
+        """
+        Check many paths in one call, return a list of booleans (one per path).
+        With details=True return (valid, first_invalid) lists instead, where
+        first_invalid is the index of the first vertex that cannot be reached
+        (None if valid)
+        """
+        # hash every adjacency list once so each hop is a set lookup
+        # instead of a scan of the neighbor list, later calls reuse it
+        if self.edge_index is None:
+            self.edge_index = {v: set(self.adj_list[v]) for v in self.adj_list}
+        index = self.edge_index
+        valid = []
+        first_invalid = []
+
+        for path in paths:
+            bad = None
+
+            if path:
+                out = index.get(path[0])
+                if out is None:
+                    bad = 0
+                else:
+                    for i in range(1, len(path)):
+                        if path[i] not in out:
+                            bad = i
+                            break
+                        out = index[path[i]]
+
+            valid.append(bad is None)
+            if details:
+                first_invalid.append(bad)
 
+        if details:
+            return valid, first_invalid
+
+        return valid
+
+    @profiled
     def dfs(self, v_start, v_end=None) -> []:
         """
         Return list of vertices visited during DFS search
@@ -174,8 +286,12 @@ class UndirectedGraph:
             v_end = None
 
         d.append(v_start)
+        prof = self.profiler
+        peak = 1
 
         while d:
+            if prof is not None and len(d) > peak:
+                peak = len(d)
             # pop next vertex to explore off stack
             vert = d.pop()
             if vert not in visited:
@@ -193,9 +309,16 @@ class UndirectedGraph:
                     if i not in v:
                         d.append(i)
 
+        # every expanded vertex had its neighbor list sorted once
+        if prof is not None:
+            prof.incr('dfs', 'vertices_expanded', len(v))
+            prof.incr('dfs', 'neighbor_sorts', len(v))
+            prof.peak('dfs', 'peak_frontier', peak)
+
         return visited
        
 
+    @profiled
     def bfs(self, v_start, v_end=None) -> []:
         """
         Return list of vertices visited during BFS search
@@ -213,8 +336,12 @@ class UndirectedGraph:
             v_end = None
 
         d.appendleft(v_start)
+        prof = self.profiler
+        peak = 1
 
         while d:
+            if prof is not None and len(d) > peak:
+                peak = len(d)
             vert = d.pop()
             if vert not in visited:
                 visited.append(vert)
@@ -231,9 +358,16 @@ class UndirectedGraph:
                     if i not in v:
                         d.appendleft(i)
 
+        # every expanded vertex had its neighbor list sorted once
+        if prof is not None:
+            prof.incr('bfs', 'vertices_expanded', len(v))
+            prof.incr('bfs', 'neighbor_sorts', len(v))
+            prof.peak('bfs', 'peak_frontier', peak)
+
         return visited
         
 
+    @profiled
     def count_connected_components(self):
         """
         Return number of connected componets in the graph
@@ -254,6 +388,7 @@ class UndirectedGraph:
 
         return len(comps)
 
+    @profiled
     def has_cycle(self):
         """
         Return True if graph contains a cycle, False otherwise
@@ -325,6 +460,16 @@ if __name__ == '__main__':
     print(g)
 
 
+    print("\nmethod remove_vertex() / compact() example 1")
+    print("--------------------------------------------")
+    g = UndirectedGraph(['AB', 'AC', 'BC', 'BD', 'CD', 'CE', 'DE'])
+    for v in 'DBZ':
+        g.remove_vertex(v)
+        print(g)
+    print(g.compact())
+    print(g, g.get_edges(), sep='\n')
+
+
     print("\nPDF - method get_vertices() / get_edges() example 1")
     print("---------------------------------------------------")
     g = UndirectedGraph()
@@ -341,6 +486,18 @@ if __name__ == '__main__':
         print(list(path), g.is_valid_path(list(path)))
 
 
+    print("\nmethod validate_paths() example 1")
+    print("---------------------------------")
+    g = UndirectedGraph(['AB', 'AC', 'BC', 'BD', 'CD', 'CE', 'DE'])
+    test_cases = [list(path) for path in ['ABC', 'ADE', 'ECABDCBE', 'ACDECB', '', 'D', 'Z']]
+    print(g.validate_paths(test_cases))
+    print(g.validate_paths(test_cases, details=True))
+    # the cached index follows later edits
+    g.add_edge('A', 'D')
+    g.remove_vertex('E')
+    print(g.validate_paths(test_cases, details=True))
+
+
     print("\nPDF - method dfs() and bfs() example 1")
     print("--------------------------------------")
     edges = ['AE', 'AC', 'BE', 'CE', 'CD', 'CB', 'BD', 'ED', 'BH', 'QG', 'FG']